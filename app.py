@@ -1,12 +1,84 @@
+import time
+_INICIO_EXECUCAO = time.perf_counter()
+
+import os
+from functools import partial
+from io import BytesIO
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import gspread
-from google.oauth2.service_account import Credentials
-from io import BytesIO
+from streamlit.logger import get_logger
+
+# gspread, google-auth e o xlsxwriter são importados sob demanda (ver FUNÇÕES CORE
+# e EXPORTAR) para não atrasar o primeiro desenho da tela.
+
+logger = get_logger("pesquisa_precos")
+
+# ================== ASSETS ESTÁTICOS ==================
+# Variantes reduzidas do banner/ícone, geradas e versionadas por gerar_assets.py
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+PASTA_STATIC = os.path.join(PASTA_APP, "static")
+LARGURAS_BANNER = (480, 960, 1600)
+LARGURA_BANNER_PADRAO = 960
+ICONE_REDUZIDO = os.path.join(PASTA_STATIC, "icon_64.png")
+
+def _variantes_banner():
+    return [w for w in LARGURAS_BANNER if os.path.exists(os.path.join(PASTA_STATIC, f"banner_{w}.webp"))]
+
+def exibir_banner():
+    variantes = _variantes_banner()
+    if variantes and st.get_option("server.enableStaticServing"):
+        # O navegador escolhe a variante pela largura da tela e mantém em cache
+        srcset = ", ".join(f"app/static/banner_{w}.webp {w}w" for w in variantes)
+        st.markdown(
+            f'<img src="app/static/banner_{variantes[0]}.webp" srcset="{srcset}" '
+            f'sizes="98vw" alt="Mart Minas" style="width: 100%; height: auto;">',
+            unsafe_allow_html=True,
+        )
+    elif variantes:
+        # Sem srcset todos recebem a mesma imagem: a intermediária (ou a menor existente)
+        largura = LARGURA_BANNER_PADRAO if LARGURA_BANNER_PADRAO in variantes else variantes[0]
+        st.image(os.path.join(PASTA_STATIC, f"banner_{largura}.webp"), use_container_width=True)
+    else:
+        st.image("banner.png", use_container_width=True)
+
+# ================== MÉTRICAS DE INICIALIZAÇÃO ==================
+@st.cache_resource(show_spinner=False)
+def _estado_processo():
+    return {"execucoes": 0}
+
+def classificar_partida():
+    """Chamada uma vez por execução do script.
+
+    "fria" (primeira execução do processo), "sessao" (primeira execução de um novo
+    usuário) ou "quente" (rerun de uma sessão já aberta).
+    """
+    estado = _estado_processo()
+    if estado["execucoes"] == 0:
+        partida = "fria"
+    elif "_sessao_iniciada" not in st.session_state:
+        partida = "sessao"
+    else:
+        partida = "quente"
+    estado["execucoes"] += 1
+    st.session_state._sessao_iniciada = True
+    return partida
+
+def registrar_tempo(evento, tela, partida):
+    """Loga os ms desde o início do script até o evento.
+
+    banner: banner enviado, antes de qualquer chamada ao Google (login e loja).
+    conteudo: dados da planilha carregados (todas as telas), comparável entre elas.
+    """
+    ms = (time.perf_counter() - _INICIO_EXECUCAO) * 1000
+    user_agent = st.context.headers.get("User-Agent", "")
+    movel = "Mobi" in user_agent or "Android" in user_agent
+
+    logger.info("%s_ms tela=%s partida=%s movel=%s ms=%.1f", evento, tela, partida, movel, ms)
 
 # ================== CONFIGURAÇÃO ==================
-st.set_page_config(page_title="Pesquisa Mart Minas", layout="wide", page_icon="icon.png")
+st.set_page_config(page_title="Pesquisa Mart Minas", layout="wide", page_icon=ICONE_REDUZIDO if os.path.exists(ICONE_REDUZIDO) else "icon.png")
 
 # CSS para layout e centralização
 st.markdown("""
@@ -74,17 +146,24 @@ for key, value in DEFAULT_CONFIG.items():
 # ================== FUNÇÕES CORE ==================
 @st.cache_resource
 def authenticate_gspread():
+    from google.oauth2.service_account import Credentials
+
     scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
     creds_info = dict(st.secrets["gcp_service_account"])
     return Credentials.from_service_account_info(creds_info, scopes=scopes)
 
+def conectar_gspread():
+    import gspread
+
+    return gspread.authorize(authenticate_gspread())
+
 def listar_planilhas_no_drive(_client):
     lista_arquivos = _client.list_spreadsheet_files()
     return {f["name"]: f["id"] for f in lista_arquivos}
 
 @st.cache_data(ttl=30)
 def fetch_data(spreadsheet_id):
-    client = gspread.authorize(authenticate_gspread())
+    client = conectar_gspread()
     sheet = client.open_by_key(spreadsheet_id).get_worksheet(0)
     data = sheet.get_values("A:G")
     df = pd.DataFrame(data[1:], columns=data[0])
@@ -92,7 +171,7 @@ def fetch_data(spreadsheet_id):
 
 def salvar_dados(spreadsheet_id, indice_original, preco, observacao):
     try:
-        client = gspread.authorize(authenticate_gspread())
+        client = conectar_gspread()
         sheet = client.open_by_key(spreadsheet_id).get_worksheet(0)
         preco_limpo = str(preco).replace(",", ".").strip()
         linha_sheets = int(indice_original + 2)
@@ -147,6 +226,18 @@ def aplicar_filtros_configuracoes(df):
 
 # ================== FUNÇÃO EXPORTAR ==================
 
+def gerar_relatorio_consolidado(df_filtrado):
+    cols = df_filtrado.columns
+    dict_all = {"Base Completa Drive": df_filtrado}
+
+    labels = ["Comprador", "Concorrente", "Loja"]
+
+    for i, grp in enumerate([cols[1], cols[5], cols[0]]):
+        dict_all[f"Contagem_{labels[i]}"] = calcular_metricas_simples(df_filtrado, grp)
+        dict_all[f"Soma_{labels[i]}"] = calcular_soma_competitividade_simples(df_filtrado, grp, format_money=False)
+
+    return to_excel_consolidated(dict_all)
+
 def to_excel_consolidated(dict_dfs):
     output = BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -260,6 +351,62 @@ def formatar_moeda(valor):
         return valor
     return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
+# ================== RENDERIZAÇÃO DE TABELAS ==================
+# As tabelas vão numéricas (Arrow) para o navegador, que formata moeda e % pelo
+# column_config; nada de formatar célula por célula em Python com Styler.
+LINHAS_POR_PAGINA = 200
+
+def _chave_coluna(df, posicao, col):
+    # Colunas MultiIndex repetem o último nível entre grupos: usa a posição
+    # (as colunas de índice vêm primeiro na contagem do Streamlit)
+    if isinstance(df.columns, pd.MultiIndex):
+        return df.index.nlevels + posicao
+    return col
+
+def _coluna_moeda(nome_col):
+    # "localized" segue o idioma do navegador (1.234,56 em pt-BR); step fixa as 2 casas
+    # e o R$ vai no cabeçalho, já que o Streamlit não tem formato pronto para real
+    return st.column_config.NumberColumn(f"{nome_col} (R$)", format="localized", step=0.01)
+
+def configurar_colunas_metricas(df):
+    """column_config equivalente ao antigo aplicar_estilo_dinamico."""
+    config = {}
+    for posicao, col in enumerate(df.columns):
+        # Se for MultiIndex, pega o último nível da tupla
+        nome_col = str(col[-1] if isinstance(col, tuple) else col)
+        if not pd.api.types.is_numeric_dtype(df.iloc[:, posicao]):
+            continue
+
+        if "%" in nome_col:
+            coluna = st.column_config.NumberColumn(format="%.1f%%")
+        elif any(word in nome_col for word in ["Soma", "Média", "Mart Minas", "Concorrente"]):
+            coluna = _coluna_moeda(nome_col)
+        else:
+            # Contagem pura (Encontrados, Menor, Maior)
+            coluna = st.column_config.NumberColumn(format="%d")
+        config[_chave_coluna(df, posicao, col)] = coluna
+    return config
+
+def configurar_colunas_produtos(df):
+    config = {}
+    for posicao, col in enumerate(df.columns):
+        if col == "Comp. %":
+            coluna = st.column_config.NumberColumn(format="%.1f%%")
+        else:
+            coluna = _coluna_moeda(col)
+        config[_chave_coluna(df, posicao, col)] = coluna
+    return config
+
+def exibir_tabela(df, column_config, key, hide_index=False, paginar=False):
+    # Só a tabela de produtos é paginada: as de métricas são curtas e terminam numa
+    # linha TOTAL, que não pode ficar isolada na última página
+    if paginar and len(df) > LINHAS_POR_PAGINA:
+        n_paginas = -(-len(df) // LINHAS_POR_PAGINA)
+        pagina = st.number_input(f"Página (1 a {n_paginas})", min_value=1, max_value=n_paginas, value=1, key=f"{key}_pagina")
+        inicio = (pagina - 1) * LINHAS_POR_PAGINA
+        df = df.iloc[inicio:inicio + LINHAS_POR_PAGINA]
+    st.dataframe(df, column_config=column_config, use_container_width=True, hide_index=hide_index)
+
 # ================== LÓGICA DE VISÕES ==================
 
 def calcular_metricas_simples(df, agrupador):
@@ -330,7 +477,7 @@ def visao_matriz_loja_concorrente(df, tipo="contagem"):
             headers.extend([(lj, conc, 'Soma Mart Minas'), (lj, conc, 'Soma Concorrente'), (lj, conc, 'Comp. %')])
     
     m_index = pd.MultiIndex.from_tuples(headers)
-    df_final = pd.DataFrame(index=compradores, columns=m_index)
+    df_final = pd.DataFrame(index=compradores, columns=m_index, dtype=float)
     
     for compr in compradores:
         for _, row in lojas_concorrentes.iterrows():
@@ -368,7 +515,7 @@ def visao_matriz_loja_concorrente(df, tipo="contagem"):
 
 def gerar_tabelas_produtos_cruzada(df):
     if df.empty:
-        return pd.DataFrame().style
+        return pd.DataFrame()
 
     # Definição das colunas baseadas na estrutura do seu código
     c_loja, c_comprador, c_produto, c_preco_conc, c_concorrente, c_preco_mart = \
@@ -409,26 +556,22 @@ def gerar_tabelas_produtos_cruzada(df):
     
     df_final = pd.concat([df_mart, df_medias, df_lojas], axis=1)
     df_final = df_final[mask_visual] # Aplica o corte na tabela final
+    df_final["Comp. %"] = df_final["Comp. %"] * 100  # mesma escala 0-100 das tabelas de métricas
 
-    # 6. Formatação Segura
-    def formatar_valores(val, is_perc=False):
-        if pd.isna(val) or val == 0: return ""
-        if is_perc: return f"{val:.1%}"
-        return f"R$ {val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-    # Criando o dicionário de formatação mapeado
-    format_map = {}
-    for col in df_final.columns:
-        if col == "Comp. %":
-            format_map[col] = lambda x: formatar_valores(x, is_perc=True)
-        else:
-            format_map[col] = lambda x: formatar_valores(x)
-
-    return df_final.style.format(format_map)
+    # 6. Zeros ficam em branco, como nulos (a formatação é feita no navegador)
+    return df_final.replace(0, np.nan)
 
 # ================== APP ==================
 try:
-    client = gspread.authorize(authenticate_gspread())
+    partida = classificar_partida()
+    tela = "login" if not st.session_state.autenticado else st.session_state.perfil
+
+    # Banner antes de qualquer chamada ao Google: é o primeiro conteúdo que o celular recebe
+    if not st.session_state.autenticado or st.session_state.perfil == "loja":
+        exibir_banner()
+        registrar_tempo("banner", tela, partida)
+
+    client = conectar_gspread()
     planilhas_drive = listar_planilhas_no_drive(client)
     NOME_PADRAO = "Pesquisa de Preços"
 
@@ -443,6 +586,7 @@ try:
         # Mantém a lógica padrão para outros casos
         id_atual = planilhas_drive.get(NOME_PADRAO, list(planilhas_drive.values())[0])
     df_raw = fetch_data(id_atual)
+    registrar_tempo("conteudo", tela, partida)
     cols = df_raw.columns
 
     if st.session_state.autenticado and st.session_state.perfil == "comercial":
@@ -453,7 +597,6 @@ try:
 
     # Login
     if not st.session_state.autenticado:            
-            st.image("banner.png", use_container_width=True)
             st.markdown('<div class="titulo-centralizado">Portal de Pesquisa</div>', unsafe_allow_html=True)
             t1, t2 = st.tabs(["Acesso Lojas 🏪", "Acesso Comercial 📊"])
             
@@ -484,19 +627,10 @@ try:
         # ================= APLICA CONFIGURAÇÕES ATIVAS =================
         df_filtrado = aplicar_filtros_configuracoes(df_completo)
 
-        # ================= MONTA DICIONÁRIO DE EXPORTAÇÃO =================
-        dict_all = {"Base Completa Drive": df_filtrado}
-
-        labels = ["Comprador", "Concorrente", "Loja"]
-
-        for i, grp in enumerate([cols[1], cols[5], cols[0]]):
-            dict_all[f"Contagem_{labels[i]}"] = calcular_metricas_simples(df_filtrado, grp)
-            dict_all[f"Soma_{labels[i]}"] = calcular_soma_competitividade_simples(df_filtrado, grp, format_money=False)
-
-        excel_data = to_excel_consolidated(dict_all)
+        # ================= EXPORTAÇÃO (GERADA SÓ NO CLIQUE) =================
         st.sidebar.download_button(
             label="📥 Exportar Relatório Completo",
-            data=excel_data,
+            data=partial(gerar_relatorio_consolidado, df_filtrado),
             file_name=f"Relatorio_Consolidado.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             use_container_width=True
@@ -504,26 +638,6 @@ try:
 
         tabs = st.tabs(["Comprador", "Concorrente", "Loja", "Completo", "Preços Por Produto", "⚙️ Configurações"])
         
-        # FORMATADOR INTELIGENTE DE COLUNAS
-        def aplicar_estilo_dinamico(styler):
-            # Obtém os nomes das colunas (incluindo MultiIndex se houver)
-            colunas = styler.data.columns
-            format_dict = {}
-            
-            for col in colunas:
-                # Se for MultiIndex, pega o último nível da tupla
-                nome_col = col[2] if isinstance(col, tuple) and len(col) > 2 else (col[1] if isinstance(col, tuple) else col)
-                
-                if "Comp. %" in str(nome_col) or "%" in str(nome_col):
-                    format_dict[col] = "{:.1f}%"
-                elif any(word in str(nome_col) for word in ["Soma", "Média", "Mart Minas", "Concorrente"]):
-                    format_dict[col] = formatar_moeda
-                else:
-                    # Se for contagem pura (Encontrados, Menor, Maior)
-                    format_dict[col] = lambda x: "" if pd.isna(x) else f"{int(x)}" if isinstance(x, (int, float)) else x
-            
-            return styler.format(format_dict)
-
         # Abas Comprador, Concorrente, Loja
         for i, grp in enumerate([cols[1], cols[5], cols[0]]):
             with tabs[i]:
@@ -534,25 +648,27 @@ try:
                 st.divider()
                 st.subheader("Cestas R$")
                 df_sm = calcular_soma_competitividade_simples(df_filtrado, grp, format_money=False)
-                st.dataframe(aplicar_estilo_dinamico(df_sm.style), use_container_width=True, hide_index=True)
+                exibir_tabela(df_sm, configurar_colunas_metricas(df_sm), key=f"soma_{i}", hide_index=True)
 
         with tabs[3]: # Aba Completo
             st.subheader("Mart Minas Menor Preço")
             df_lc_c = visao_matriz_loja_concorrente(df_filtrado, "contagem")
-            st.dataframe(aplicar_estilo_dinamico(df_lc_c.style), use_container_width=True)
+            exibir_tabela(df_lc_c, configurar_colunas_metricas(df_lc_c), key="matriz_contagem")
             
             st.divider()
             st.subheader("Cestas R$")
             df_lc_s = visao_matriz_loja_concorrente(df_filtrado, "soma")
-            st.dataframe(aplicar_estilo_dinamico(df_lc_s.style), use_container_width=True)
+            exibir_tabela(df_lc_s, configurar_colunas_metricas(df_lc_s), key="matriz_soma")
 
         with tabs[4]:
             st.subheader("Preços por Produto (Concorrentes × Mart Minas)")
-            df_styled = gerar_tabelas_produtos_cruzada(df_filtrado)
-            st.dataframe(
-                df_styled,
-                use_container_width=True,
+            df_produtos = gerar_tabelas_produtos_cruzada(df_filtrado)
+            exibir_tabela(
+                df_produtos,
+                configurar_colunas_produtos(df_produtos),
+                key="produtos",
                 hide_index=False,           # mostra comprador e produto no índice
+                paginar=True,
             )
 
         with tabs[5]:  # Aba Configurações
@@ -638,8 +754,6 @@ try:
         comp_sel = st.sidebar.selectbox("Filtrar por Setor:", ["Todos"] + sorted(df_f[cols[1]].unique()))
         if comp_sel != "Todos":
             df_f = df_f[df_f[cols[1]] == comp_sel]
-                    
-        st.image("banner.png", use_container_width=True)
 
         if not df_f.empty:
             # Progresso
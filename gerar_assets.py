@@ -0,0 +1,32 @@
+"""Gera as variantes reduzidas do banner e do ícone servidas pelo app em ./static.
+
+Rodar sempre que banner.png ou icon.png mudar e versionar o resultado:
+    python gerar_assets.py
+O app nunca gera imagens durante uma requisição; sem as variantes ele volta a
+usar banner.png / icon.png.
+"""
+import os
+
+from PIL import Image
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+PASTA_STATIC = os.path.join(PASTA_APP, "static")
+LARGURAS_BANNER = (480, 960, 1600)
+TAMANHO_ICONE = 64
+
+def main():
+    os.makedirs(PASTA_STATIC, exist_ok=True)
+    with Image.open(os.path.join(PASTA_APP, "banner.png")) as banner:
+        for largura in LARGURAS_BANNER:
+            altura = round(banner.height * largura / banner.width)
+            destino = os.path.join(PASTA_STATIC, f"banner_{largura}.webp")
+            banner.resize((largura, altura), Image.LANCZOS).save(destino, "WEBP", quality=80)
+            print(destino, os.path.getsize(destino))
+
+    with Image.open(os.path.join(PASTA_APP, "icon.png")) as icone:
+        destino = os.path.join(PASTA_STATIC, f"icon_{TAMANHO_ICONE}.png")
+        icone.resize((TAMANHO_ICONE, TAMANHO_ICONE), Image.LANCZOS).save(destino, optimize=True)
+        print(destino, os.path.getsize(destino))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""Teste de carga do app com usuários simultâneos e um Google Sheets falso em memória.
+
+Substitui o gspread (e o google-auth) por uma planilha em processo com latência e
+erros 429 configuráveis, e dispara N sessões de loja e M sessões do comercial pela
+API de testes do Streamlit (AppTest), todas no mesmo processo — como num servidor real.
+
+Atenção: para rodar várias AppTest em paralelo o harness mexe em internals privados
+do Streamlit (Runtime._instance, app_test.Runtime, o ScriptCache do app_test e do
+local_script_runner, Secrets._secrets e MediaFileManager.add_deferred). Eles mudam sem
+aviso entre versões, por isso o harness só roda na versão para a qual foi escrito
+(STREAMLIT_TESTADO) e recusa as demais com uma mensagem clara.
+
+Uso:
+    python loadtest.py --cenario 1:0 --cenario 10:1 --cenario 30:3 --latencia-ms 150 --taxa-429 0.02
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+STREAMLIT_TESTADO = "1.66"
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SENHA_COMERCIAL = "comercialmm2026"
+NOME_PADRAO = "Pesquisa de Preços"
+NOME_COMERCIAL = "Pesquisa Semana 01"
+DOWNLOADS_ADIADOS = {}
+CABECALHO = ["Loja", "Comprador", "Produto", "Preço Concorrente", "Observação", "Concorrente", "Preço Mart Minas"]
+
+# ================== PLANILHA FALSA ==================
+class APIErrorFalso(Exception):
+    def __init__(self, code, mensagem):
+        super().__init__(f"APIError: [{code}]: {mensagem}")
+        self.code = code
+
+class BackendFalso:
+    """Estado compartilhado por todas as sessões: planilhas, contadores e cota."""
+
+    def __init__(self, planilhas, latencia_ms=100, jitter_ms=50, taxa_429=0.0, cota_por_minuto=None, seed=0):
+        self.planilhas = planilhas  # {nome: (id, linhas)}
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_429 = taxa_429
+        self.cota_por_minuto = cota_por_minuto
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._janela = []
+        self.chamadas = Counter()
+
+    def chamar(self, metodo):
+        """Simula a ida ao Google: conta a chamada, aplica a cota/429 e espera a latência."""
+        with self._lock:
+            self.chamadas[metodo] += 1
+            agora = time.monotonic()
+            self._janela = [t for t in self._janela if agora - t < 60]
+            self._janela.append(agora)
+            estourou_cota = self.cota_por_minuto is not None and len(self._janela) > self.cota_por_minuto
+            sorteou_429 = self._random.random() < self.taxa_429
+            espera = max(0.0, self.latencia_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            if estourou_cota or sorteou_429:
+                self.chamadas["429"] += 1
+        time.sleep(espera)
+        if estourou_cota or sorteou_429:
+            raise APIErrorFalso(429, "Quota exceeded")
+
+    def linhas(self, spreadsheet_id):
+        for sid, linhas in self.planilhas.values():
+            if sid == spreadsheet_id:
+                return linhas
+        raise APIErrorFalso(404, f"Requested entity was not found: {spreadsheet_id}")
+
+class WorksheetFalsa:
+    def __init__(self, backend, spreadsheet_id):
+        self._backend = backend
+        self._id = spreadsheet_id
+
+    def get_values(self, intervalo):
+        self._backend.chamar("get_values")
+        with self._backend._lock:
+            return [list(linha) for linha in self._backend.linhas(self._id)]
+
+    def update(self, intervalo, valores):
+        self._backend.chamar("update")
+        # Aceita só o formato usado pelo app: "D10:E10"
+        inicio = intervalo.split(":")[0]
+        col, linha = ord(inicio[0]) - ord("A"), int(inicio[1:]) - 1
+        with self._backend._lock:
+            destino = self._backend.linhas(self._id)[linha]
+            for i, valor in enumerate(valores[0]):
+                destino[col + i] = valor
+
+class SpreadsheetFalsa:
+    def __init__(self, backend, spreadsheet_id):
+        self._backend = backend
+        self._id = spreadsheet_id
+
+    def get_worksheet(self, indice):
+        return WorksheetFalsa(self._backend, self._id)
+
+class ClienteFalso:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def list_spreadsheet_files(self):
+        self._backend.chamar("list_spreadsheet_files")
+        return [{"name": nome, "id": sid} for nome, (sid, _) in self._backend.planilhas.items()]
+
+    def open_by_key(self, spreadsheet_id):
+        self._backend.chamar("open_by_key")
+        return SpreadsheetFalsa(self._backend, spreadsheet_id)
+
+def instalar_modulos_falsos(backend):
+    """Registra gspread e google.oauth2.service_account falsos em sys.modules.
+
+    O app importa os dois sob demanda, então basta fazer isso antes da primeira execução.
+    """
+    gspread = types.ModuleType("gspread")
+    excecoes = types.ModuleType("gspread.exceptions")
+    excecoes.APIError = APIErrorFalso
+    gspread.exceptions = excecoes
+    gspread.authorize = lambda credenciais: ClienteFalso(backend)
+
+    conta_servico = types.ModuleType("google.oauth2.service_account")
+    conta_servico.Credentials = types.SimpleNamespace(from_service_account_info=lambda info, scopes=None: object())
+
+    sys.modules.update({
+        "gspread": gspread,
+        "gspread.exceptions": excecoes,
+        "google.oauth2.service_account": conta_servico,
+    })
+
+def gerar_planilha(n_lojas=5, n_concorrentes=3, n_compradores=4, n_produtos=40, seed=0):
+    rnd = random.Random(seed)
+    linhas = [list(CABECALHO)]
+    for l in range(n_lojas):
+        for c in range(n_concorrentes):
+            for p in range(n_produtos):
+                preco_mart = round(rnd.uniform(2, 60), 2)
+                preco_conc = f"{preco_mart * rnd.uniform(0.7, 1.3):.2f}" if rnd.random() < 0.5 else ""
+                linhas.append([f"Loja {l + 1:02d}", f"Comprador {p % n_compradores + 1}", f"Produto {p + 1:03d}",
+                               preco_conc, "", f"Concorrente {c + 1}", f"{preco_mart:.2f}"])
+    return linhas
+
+# ================== RUNTIME COMPARTILHADO ==================
+def preparar_streamlit():
+    """Permite rodar várias AppTest ao mesmo tempo, em threads, no mesmo processo.
+
+    Cada AppTest.run() cria um Runtime falso, instala em Runtime._instance e o zera ao
+    terminar — o que quebraria as outras sessões em andamento. Aqui todas passam a usar
+    um único Runtime (e os mesmos caches), como as sessões de um servidor de verdade.
+    """
+    import streamlit as st
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    versao = ".".join(st.__version__.split(".")[:2])
+    if versao != STREAMLIT_TESTADO:
+        raise SystemExit(
+            f"loadtest.py foi escrito para o Streamlit {STREAMLIT_TESTADO}.x e depende de internals "
+            f"privados dele; a versão instalada é {st.__version__}. Revise preparar_streamlit() "
+            f"e atualize STREAMLIT_TESTADO antes de confiar nos números."
+        )
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+    # Todas as AppTest usam o mesmo session_id, então o rerun de uma sessão descarta os
+    # downloads adiados das outras; guardamos o callable para executá-lo no "clique"
+    registrar_adiado = runtime.media_file_mgr.add_deferred
+
+    def add_deferred(callable_, *args, **kwargs):
+        file_id = registrar_adiado(callable_, *args, **kwargs)
+        DOWNLOADS_ADIADOS[file_id] = callable_
+        return file_id
+
+    runtime.media_file_mgr.add_deferred = add_deferred
+
+    # O AppTest passa a escrever num Runtime "de mentira"; o verdadeiro fica fixo
+    app_test.Runtime = type("RuntimeIgnorado", (), {"_instance": None})
+
+    # Um único cache de bytecode, já compilado: parsear o script em várias threads
+    # ao mesmo tempo derruba o compilador do CPython 3.11
+    script_cache = app_test.ScriptCache()
+    script_cache.get_bytecode(APP)
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    config.set_option("global.appTest", True)
+    set_log_level("error")  # avisos de depreciação e logs do app poluem o relatório
+
+    secrets = Secrets()
+    secrets._secrets = {"gcp_service_account": {"type": "service_account"}}
+    st.secrets = secrets
+
+# ================== SESSÕES SIMULADAS ==================
+class SessaoInterrompida(Exception):
+    pass
+
+def _widget(at, lista, label):
+    for w in lista:
+        if w.label == label:
+            return w
+    # Sem o widget esperado a sessão não tem como seguir: guarda o que estava na tela
+    na_tela = [e.value for e in at.error] + [e.message for e in at.exception]
+    raise SessaoInterrompida(f"'{label}' não apareceu na tela: {na_tela}")
+
+class Sessao:
+    """Uma AppTest cronometrada: cada rerun vira uma amostra de latência.
+
+    As exportações são medidas à parte, em amostras_exportacao.
+    """
+
+    def __init__(self):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP, default_timeout=120)
+        self.amostras = []
+        self.amostras_exportacao = []
+        self.erros = 0
+        self.falha = None
+
+    @staticmethod
+    def _cronometrar(acao, amostras):
+        inicio = time.perf_counter()
+        acao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+
+    def rodar(self, passo):
+        self._cronometrar(lambda: passo(self.at).run(), self.amostras)
+        self.erros += len(self.at.exception) + len(self.at.error)
+
+def sessao_loja(s, loja, concorrente, n_salvamentos, seed):
+    rnd = random.Random(seed)
+    s.rodar(lambda at: at)
+    s.rodar(lambda at: _widget(at, at.selectbox, "Loja:").set_value(loja))
+    s.rodar(lambda at: _widget(at, at.selectbox, "Concorrente:").set_value(concorrente))
+    s.rodar(lambda at: _widget(at, at.button, "Entrar 🚀").click())
+    for _ in range(n_salvamentos):
+        produtos = _widget(s.at, s.at.selectbox, "Selecione o Produto:")
+        s.rodar(lambda at: produtos.set_value(rnd.choice(produtos.options)))
+        s.rodar(lambda at: _widget(at, at.text_input, "Preço Concorrente (R$):").input(f"{rnd.uniform(2, 60):.2f}"))
+        s.rodar(lambda at: _widget(at, at.button, "💾 Salvar e Avançar").click())
+
+def sessao_comercial(s, n_interacoes, seed):
+    rnd = random.Random(seed)
+    s.rodar(lambda at: at)
+    s.rodar(lambda at: _widget(at, at.text_input, "Senha Comercial:").input(SENHA_COMERCIAL))
+    s.rodar(lambda at: _widget(at, at.button, "Acessar Painel 📈").click())
+    for _ in range(n_interacoes):
+        # As abas do app trocam no navegador sem rerun; o que gera rerun é o filtro lateral
+        compradores = _widget(s.at, s.at.sidebar.selectbox, "Filtrar Comprador:")
+        s.rodar(lambda at: compradores.set_value(rnd.choice(compradores.options)))
+        # Exportação: o relatório só é montado no clique, como o servidor faz ao baixar
+        s._cronometrar(lambda: exportar_relatorio(s.at), s.amostras_exportacao)
+
+def executar_sessao(fluxo, *args):
+    s = Sessao()
+    try:
+        fluxo(s, *args)
+    except Exception as e:
+        s.falha = f"{type(e).__name__}: {e}"
+    return s
+
+def exportar_relatorio(at):
+    if not at.sidebar.download_button:
+        raise SessaoInterrompida("botão de exportação não apareceu na tela")
+    botao = at.sidebar.download_button[0]
+    return DOWNLOADS_ADIADOS.pop(botao.proto.deferred_file_id)()
+
+# ================== CENÁRIOS ==================
+def percentis(amostras, prefixo=""):
+    if not amostras:
+        return {f"{prefixo}p50_ms": np.nan, f"{prefixo}p95_ms": np.nan, f"{prefixo}p99_ms": np.nan}
+    p50, p95, p99 = np.percentile(amostras, [50, 95, 99])
+    return {f"{prefixo}p50_ms": p50, f"{prefixo}p95_ms": p95, f"{prefixo}p99_ms": p99}
+
+def rodar_cenario(backend, n_lojas, n_comercial, args):
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    backend.chamadas.clear()
+    DOWNLOADS_ADIADOS.clear()
+
+    lojas = sorted({linha[0] for linha in backend.planilhas[NOME_PADRAO][1][1:]})
+    concorrentes = sorted({linha[5] for linha in backend.planilhas[NOME_PADRAO][1][1:]})
+    tarefas = []
+    with ThreadPoolExecutor(max_workers=max(1, n_lojas + n_comercial)) as pool:
+        inicio = time.perf_counter()
+        for i in range(n_lojas):
+            tarefas.append(pool.submit(executar_sessao, sessao_loja, lojas[i % len(lojas)], concorrentes[i % len(concorrentes)],
+                                       args.salvamentos, args.seed + i))
+        for i in range(n_comercial):
+            tarefas.append(pool.submit(executar_sessao, sessao_comercial, args.interacoes, args.seed + 1000 + i))
+        sessoes = [t.result() for t in tarefas]
+        duracao = time.perf_counter() - inicio
+
+    amostras = [a for s in sessoes for a in s.amostras]
+    exportacoes = [a for s in sessoes for a in s.amostras_exportacao]
+    linha = {
+        "cenario": f"{n_lojas} lojas + {n_comercial} comercial",
+        "reruns": len(amostras),
+        "duracao_s": duracao,
+        "reruns_por_s": len(amostras) / duracao,
+        **percentis(amostras),
+        "exportacoes": len(exportacoes),
+        **percentis(exportacoes, prefixo="exportacao_"),
+        "erros_na_tela": sum(s.erros for s in sessoes),
+        "sessoes_interrompidas": sum(s.falha is not None for s in sessoes),
+    }
+    linha.update({f"api_{metodo}": n for metodo, n in sorted(backend.chamadas.items())})
+    for s in sessoes:
+        if s.falha:
+            print(f"[{linha['cenario']}] sessão interrompida: {s.falha}", file=sys.stderr)
+    return linha
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cenario", action="append", metavar="LOJAS:COMERCIAL",
+                        help="sessões simultâneas de loja e do comercial (pode repetir; padrão: 1:0, 5:1, 20:2)")
+    parser.add_argument("--salvamentos", type=int, default=5, help="'Salvar e Avançar' por sessão de loja")
+    parser.add_argument("--interacoes", type=int, default=3, help="trocas de filtro + exportações por sessão do comercial")
+    parser.add_argument("--latencia-ms", type=float, default=150, help="latência média de cada chamada ao Sheets")
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="probabilidade de 429 em cada chamada")
+    parser.add_argument("--cota-por-minuto", type=int, default=None, help="responde 429 acima deste nº de chamadas/min")
+    parser.add_argument("--produtos", type=int, default=40, help="produtos por loja/concorrente na planilha falsa")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = BackendFalso(
+        {
+            NOME_PADRAO: ("id-pesquisa", gerar_planilha(n_produtos=args.produtos, seed=args.seed)),
+            NOME_COMERCIAL: ("id-semana-01", gerar_planilha(n_produtos=args.produtos, seed=args.seed + 1)),
+        },
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        taxa_429=args.taxa_429,
+        cota_por_minuto=args.cota_por_minuto,
+        seed=args.seed,
+    )
+    instalar_modulos_falsos(backend)
+    preparar_streamlit()
+
+    resultados = []
+    for cenario in args.cenario or ["1:0", "5:1", "20:2"]:
+        n_lojas, n_comercial = (int(n) for n in cenario.split(":"))
+        resultados.append(rodar_cenario(backend, n_lojas, n_comercial, args))
+
+    df = pd.DataFrame(resultados).set_index("cenario")
+    # Só as contagens de API viram 0; percentis sem amostras continuam NaN (não houve medição)
+    contagens_api = [c for c in df.columns if c.startswith("api_")]
+    df[contagens_api] = df[contagens_api].fillna(0)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.1f}".format):
+        print(df.T)
+
+if __name__ == "__main__":
+    main()